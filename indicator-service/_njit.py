@@ -0,0 +1,20 @@
+"""
+Optional numba JIT.
+
+`njit` compiles with numba when it is installed and is a no-op decorator otherwise,
+so the service still runs (just slower) on hosts without numba.
+"""
+try:
+    from numba import njit as _numba_njit
+    NUMBA_AVAILABLE = True
+except ImportError:  # pragma: no cover - depends on the host
+    _numba_njit = None
+    NUMBA_AVAILABLE = False
+
+
+def njit(*args, **kwargs):
+    if NUMBA_AVAILABLE:
+        return _numba_njit(*args, **kwargs)
+    if len(args) == 1 and callable(args[0]) and not kwargs:
+        return args[0]
+    return lambda fn: fn
@@ -0,0 +1,124 @@
+"""
+Loop kernels for the custom (non-TA-Lib) indicators.
+
+The rolling kernels return arrays aligned to `prices` with the same lag conventions as
+the rest of app.py; see the forward-looking-bias notes at the top of that module.
+"""
+import math
+
+import numpy as np
+
+from _njit import NUMBA_AVAILABLE, njit
+
+try:
+    import bottleneck as bn
+except ImportError:  # pragma: no cover - depends on the host
+    bn = None
+
+
+def rolling_vol(prices: np.ndarray, period: int, annualize_factor: float) -> np.ndarray:
+    """
+    Lagged rolling sample std (ddof=1) of simple returns, times `annualize_factor`.
+
+    returns[j] = prices[j+1] / prices[j] - 1, and result[j+2] is the std of the `period`
+    returns ending at returns[j], i.e. it only uses prices up to day j+1. Windows that
+    contain a non-finite return are NaN.
+
+    Uses the numba kernel when available, otherwise bottleneck's C moving std, and only
+    falls back to the interpreted loop when neither is installed.
+    """
+    if NUMBA_AVAILABLE or bn is None:
+        return _rolling_vol_loop(prices, period, annualize_factor)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.diff(prices) / prices[:-1]
+    # a single inf would poison bottleneck's running sums for every later window
+    returns[~np.isfinite(returns)] = np.nan
+    moving = bn.move_std(returns, window=period, min_count=period, ddof=1)
+
+    result = np.full(prices.size, np.nan)
+    np.multiply(moving[period - 2:-1], annualize_factor, out=result[period:])
+    return result
+
+
+@njit(cache=True, nogil=True, error_model="numpy")
+def _rolling_vol_loop(prices, period, annualize_factor):
+    """Single O(n) pass of rolling_vol using Welford add/remove updates."""
+    n = prices.shape[0]
+    result = np.full(n, np.nan)
+    count = 0
+    bad = 0
+    mean = 0.0
+    m2 = 0.0
+    for j in range(n - 1):
+        r = (prices[j + 1] - prices[j]) / prices[j]
+        if math.isfinite(r):
+            count += 1
+            delta = r - mean
+            mean += delta / count
+            m2 += delta * (r - mean)
+        else:
+            bad += 1
+
+        if j >= period:
+            old = (prices[j - period + 1] - prices[j - period]) / prices[j - period]
+            if math.isfinite(old):
+                count -= 1
+                if count == 0:
+                    mean = 0.0
+                    m2 = 0.0
+                else:
+                    delta = old - mean
+                    mean -= delta / count
+                    m2 -= delta * (old - mean)
+            else:
+                bad -= 1
+
+        if j >= period - 1 and bad == 0 and j + 2 < n:
+            result[j + 2] = math.sqrt(max(m2, 0.0) / (period - 1)) * annualize_factor
+    return result
+
+
+@njit(cache=True, nogil=True, error_model="numpy")
+def rolling_return(prices, period):
+    """result[i] = prices[i] / prices[i - period] - 1 where the base price is positive."""
+    n = prices.shape[0]
+    result = np.full(n, np.nan)
+    for i in range(period, n):
+        base = prices[i - period]
+        if base > 0:
+            result[i] = prices[i] / base - 1.0
+    return result
+
+
+@njit(cache=True, nogil=True, error_model="numpy")
+def wilder_averages(prices, period):
+    """
+    Final Wilder-smoothed (average gain, average loss) of `prices`, seeded and updated in
+    the same operation order as TA-Lib's RSI so a stream can continue its output exactly.
+    """
+    prev = prices[0]
+    avg_gain = 0.0
+    avg_loss = 0.0
+    for i in range(1, period + 1):
+        change = prices[i] - prev
+        prev = prices[i]
+        if change < 0:
+            avg_loss -= change
+        else:
+            avg_gain += change
+    avg_loss /= period
+    avg_gain /= period
+
+    for i in range(period + 1, prices.shape[0]):
+        change = prices[i] - prev
+        prev = prices[i]
+        avg_loss *= period - 1
+        avg_gain *= period - 1
+        if change < 0:
+            avg_loss -= change
+        else:
+            avg_gain += change
+        avg_loss /= period
+        avg_gain /= period
+    return avg_gain, avg_loss
@@ -21,44 +21,58 @@ For custom indicators (non-TA-Lib):
 TA-Lib indicators (RSI, SMA, EMA, etc.) are already point-in-time correct.
 Custom indicators (VOLATILITY, CUMULATIVE_RETURN, RETURN) require manual lagging.
 """
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, Response
 from pydantic import BaseModel, Field
-from typing import List, Dict, Optional
+from typing import Any, Callable, List, Dict, Optional, Sequence
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import contextlib
+import functools
 import math
+import os
+import sqlite3
+import tempfile
+import threading
+import time
 
+import msgpack
 import numpy as np
 import pandas as pd
 import talib
+import xxhash
 from quantstats import stats as qs_stats
+from scipy.stats import norm
 
-app = FastAPI(title="Indicator Service", version="1.1")
+from _vol_loop import rolling_return, rolling_vol, wilder_averages
+
+# bottleneck is only a dependency for move_std; keep pandas (and therefore quantstats)
+# reductions on NumPy so metric values and scalar types don't change with it installed.
+pd.set_option("compute.use_bottleneck", False)
+
+# orjson serializes float64 arrays natively and writes NaN as null, so indicator
+# outputs go straight from TA-Lib to the response without a Python-level pass.
+app = FastAPI(title="Indicator Service", version="1.1", default_response_class=ORJSONResponse)
+# Long float arrays compress ~10x; level 1 keeps the CPU cost negligible.
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=1)
+
+# Number of uvicorn worker processes on this machine; serve.py exports it. Defaults to 1
+# for a single in-process server (python app.py, tests).
+WORKERS = int(os.environ.get("WORKERS", 1))
+
+# TA-Lib and the NumPy kernels release the GIL, so CPU work runs on a dedicated pool
+# instead of the shared AnyIO threadpool FastAPI uses for sync routes. Every worker
+# process gets its own pool, so the cores are split between them.
+CPU_POOL = ThreadPoolExecutor(
+    max_workers=max(1, (os.cpu_count() or 1) // WORKERS),
+    thread_name_prefix="indicator-cpu",
+)
 
 # ---------- Request models ----------
-class CloseOnlyReq(BaseModel):
-    indicator: str
-    prices: List[float]
-    params: Optional[Dict] = {}
-
-class HLCReq(BaseModel):
-    indicator: str
-    high: List[float]
-    low: List[float]
-    close: List[float]
-    params: Optional[Dict] = {}
-
-class HLCVReq(BaseModel):
-    indicator: str
-    high: List[float]
-    low: List[float]
-    close: List[float]
-    volume: List[float]
-    params: Optional[Dict] = {}
-
-class CloseVolumeReq(BaseModel):
-    indicator: str
-    close: List[float]
-    volume: List[float]
-    params: Optional[Dict] = {}
+# /indicator takes a raw dict: its arrays go straight to NumPy (see _payload_array)
+# instead of being validated element by element.
 
 # legacy / convenience for earlier curl tests
 class RSIRequest(BaseModel):
@@ -74,21 +88,120 @@ class QuantStatsRequest(BaseModel):
     confidence: float = 0.95
 
 # ---------- Utils ----------
-def _nan_to_none(arr: np.ndarray):
-    return [None if (x is None or (isinstance(x, float) and np.isnan(x))) else float(x) for x in arr]
-
 def _as_nd(a: List[float]) -> np.ndarray:
-    return np.array(a, dtype="float64")
+    # fromiter fills a preallocated float64 buffer in one pass, skipping the shape and
+    # dtype discovery np.array does over the list first
+    return np.fromiter(a, dtype=np.float64, count=len(a))
+
+
+def _payload_array(payload: dict, key: str) -> np.ndarray:
+    value = payload[key]
+    try:
+        if isinstance(value, (bytes, bytearray)):
+            # /indicator/bin: raw little-endian float64, decoded without copying
+            arr = np.frombuffer(value, dtype="<f8").astype(np.float64, copy=False)
+        elif isinstance(value, (list, tuple)):
+            # fromiter would happily iterate a string's characters or a dict's keys
+            arr = _as_nd(value)
+        else:
+            arr = None
+    except (TypeError, ValueError):
+        arr = None
+    if arr is None or arr.ndim != 1:
+        raise HTTPException(status_code=422, detail=f"{key} must be a list of numbers or float64 bytes")
+    return arr
+
+
+def _payload_params(payload: dict) -> Dict:
+    params = payload.get("params") or {}
+    if not isinstance(params, dict):
+        raise HTTPException(status_code=422, detail="params must be an object")
+    return params
+
+
+async def _run_in_pool(fn: Callable[..., Any], *args: Any) -> Any:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(CPU_POOL, fn, *args)
+
+
+def _values_response(key: str, arr: np.ndarray) -> ORJSONResponse:
+    # orjson only serializes C-contiguous arrays
+    return ORJSONResponse({key: np.ascontiguousarray(arr, dtype="float64")})
+
+
+# ---------- Indicator result cache ----------
+# Backtest sweeps request the same (series, indicator, params) many times; keep the
+# output of recent computations keyed by a hash of the input arrays.
+_INDICATOR_CACHE_SIZE = 1024
+_INDICATOR_CACHE_MAX_BYTES = 128 * 1024 * 1024  # per worker; entries are evicted LRU to stay under it
+_INDICATOR_CACHE_MAX_POINTS = 1_000_000  # bypass the cache for huge inputs
+
+_indicator_cache: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+_indicator_cache_bytes = 0
+_indicator_cache_lock = threading.Lock()
+
+
+def _clear_indicator_cache() -> None:
+    global _indicator_cache_bytes
+    with _indicator_cache_lock:
+        _indicator_cache.clear()
+        _indicator_cache_bytes = 0
+
+
+def _series_key(arrays: Sequence[np.ndarray]) -> tuple:
+    digest = xxhash.xxh3_64()
+    for arr in arrays:
+        digest.update(arr)
+    return (tuple(arr.size for arr in arrays), digest.intdigest())
+
+
+def _indicator_cache_key(ind: str, params: Dict, series_key: tuple) -> tuple:
+    params_key = tuple(sorted((str(k), repr(v)) for k, v in params.items()))
+    return (ind, params_key) + series_key
+
+
+def _cached_values(
+    ind: str,
+    params: Dict,
+    arrays: Sequence[np.ndarray],
+    compute: Callable[[], np.ndarray],
+    series_key: Optional[tuple] = None,
+) -> np.ndarray:
+    """series_key: precomputed _series_key(arrays), for callers that reuse the arrays."""
+    if sum(arr.size for arr in arrays) > _INDICATOR_CACHE_MAX_POINTS:
+        return compute()
+
+    key = _indicator_cache_key(ind, params, series_key or _series_key(arrays))
+    with _indicator_cache_lock:
+        values = _indicator_cache.get(key)
+        if values is not None:
+            _indicator_cache.move_to_end(key)
+            return values
+
+    values = compute()
+    if values.nbytes > _INDICATOR_CACHE_MAX_BYTES:
+        return values
+    values.flags.writeable = False  # shared between responses
+    global _indicator_cache_bytes
+    with _indicator_cache_lock:
+        previous = _indicator_cache.pop(key, None)  # another thread may have computed it meanwhile
+        if previous is not None:
+            _indicator_cache_bytes -= previous.nbytes
+        _indicator_cache[key] = values
+        _indicator_cache_bytes += values.nbytes
+        while len(_indicator_cache) > _INDICATOR_CACHE_SIZE or _indicator_cache_bytes > _INDICATOR_CACHE_MAX_BYTES:
+            _, evicted = _indicator_cache.popitem(last=False)
+            _indicator_cache_bytes -= evicted.nbytes
+    return values
 
 
 def _clean_numeric_list(values: Optional[List[float]]) -> np.ndarray:
     if not values:
         return np.array([], dtype="float64")
-    arr = np.array(values, dtype="float64")
-    if arr.size == 0:
-        return arr
+    arr = _as_nd(values)
     mask = np.isfinite(arr)
-    return arr[mask]
+    # the usual all-finite input skips the masked copy
+    return arr if mask.all() else arr[mask]
 
 
 _PERIOD_SETTINGS = {
@@ -110,6 +223,11 @@ _PERIOD_SETTINGS = {
 }
 
 
+# calendar days spanned by one bar, for the *_days metrics
+_DAYS_PER_BAR = {"D": 1.0, "W": 7.0, "M": 365 / 12, "Q": 365 / 4, "Y": 365.0}
+
+
+@functools.lru_cache(maxsize=64)
 def _resolve_period_settings(label: Optional[str]) -> tuple[str, int]:
     if not label:
         return "D", 252
@@ -125,6 +243,7 @@ def _resolve_period_settings(label: Optional[str]) -> tuple[str, int]:
     return "D", 252
 
 
+@functools.lru_cache(maxsize=64)
 def _annual_to_periodic_rate(rate: float, periods: int) -> float:
     try:
         annual = float(rate)
@@ -136,28 +255,95 @@ def _annual_to_periodic_rate(rate: float, periods: int) -> float:
     return (1.0 + annual) ** (1.0 / periods) - 1.0
 
 
-def _returns_series(values: np.ndarray, freq: str) -> pd.Series:
-    idx = pd.date_range(end=pd.Timestamp.today().normalize(), periods=values.size, freq=freq)
-    return pd.Series(values, index=idx, dtype="float64")
+def _returns_series(values: np.ndarray) -> pd.Series:
+    # None of the qs_stats calls left in quantstats_metrics are calendar-aware, so the
+    # default RangeIndex is enough and avoids building a DatetimeIndex per request.
+    return pd.Series(values, dtype="float64")
 
 
 def _equity_to_returns(equity: np.ndarray) -> np.ndarray:
     if equity.size < 2:
         return np.array([], dtype="float64")
-    prev = equity[:-1]
-    curr = equity[1:]
-    safe_prev = np.where(prev == 0, np.nan, prev)
-    returns = curr / safe_prev - 1.0
-    mask = np.isfinite(returns)
-    return returns[mask]
+    # a zero previous value yields inf/nan, which the finite mask drops
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.diff(equity) / equity[:-1]
+    return returns[np.isfinite(returns)]
+
+# ---------- Fused QuantStats metrics ----------
+# These mirror the quantstats.stats formulas for a clean (finite, no-NaN) returns array
+# but share one sort, one set of central moments and one drawdown curve between them
+# instead of letting each qs_stats call rescan, copy and re-derive the series.
+def _drawdown_series(returns: np.ndarray) -> np.ndarray:
+    """Drawdown of the compounded equity curve, as qs_stats.to_drawdown_series."""
+    equity = 1.0 + (np.cumprod(1.0 + returns) - 1.0)
+    # quantstats prepends a phantom starting value before taking the running peak
+    first = equity[0]
+    baseline = 100000.0 if first > 1000 else 100.0 if first > 10 else 1.0
+    peak = np.maximum(np.maximum.accumulate(equity), baseline)
+    return equity / peak - 1.0
+
+
+def _drawdown_episodes(drawdown: np.ndarray) -> tuple:
+    """Max depth and length (in bars) of each underwater run, as in qs_stats.drawdown_details."""
+    underwater = np.concatenate(([False], drawdown != 0, [False]))
+    edges = np.diff(underwater.view(np.int8))
+    starts = np.flatnonzero(edges == 1)
+    if starts.size == 0:
+        return np.empty(0), np.empty(0, dtype=np.intp)
+    lengths = np.flatnonzero(edges == -1) - starts
+    # each reduceat slice runs to the next start; the recovered tail in between is 0,
+    # so it never lowers the episode minimum
+    depths = np.minimum.reduceat(drawdown, starts)
+    return depths, lengths
+
+
+def _cagr(returns: np.ndarray, periods: int) -> float:
+    total = np.prod(1.0 + returns) - 1.0
+    years = returns.size / periods
+    return abs(total + 1.0) ** (1.0 / years) - 1.0
+
+
+def _tail_ratio(ordered: np.ndarray, cutoff: float = 0.95) -> float:
+    upper, lower = np.quantile(ordered, [cutoff, 1 - cutoff])
+    if np.isnan(upper) or np.isnan(lower) or lower == 0:
+        return np.nan
+    return abs(upper / lower)
+
+
+def _zero_out_fperr(value: float) -> float:
+    # pandas treats moments below 1e-14 as rounding noise (e.g. a constant series)
+    return 0.0 if abs(value) < 1e-14 else value
+
+
+def _skew(n: int, m2: float, m3: float) -> float:
+    # bias-corrected sample skewness, as pandas Series.skew
+    if n < 3:
+        return np.nan
+    m2 = _zero_out_fperr(m2)
+    m3 = _zero_out_fperr(m3)
+    if m2 == 0:
+        return 0.0
+    return (n * (n - 1) ** 0.5 / (n - 2)) * (m3 / m2 ** 1.5)
+
+
+def _kurtosis(n: int, m2: float, m4: float) -> float:
+    # bias-corrected excess kurtosis, as pandas Series.kurtosis
+    if n < 4:
+        return np.nan
+    numerator = _zero_out_fperr(n * (n + 1) * (n - 1) * m4)
+    denominator = _zero_out_fperr((n - 2) * (n - 3) * m2 ** 2)
+    if denominator == 0:
+        return 0.0
+    adj = 3 * (n - 1) ** 2 / ((n - 2) * (n - 3))
+    return numerator / denominator - adj
+
 
 @app.get("/health")
 def health():
     return {"status": "ok"}
 
 
-@app.post("/metrics/quantstats")
-def quantstats_metrics(req: QuantStatsRequest):
+def _compute_quantstats_metrics(req: QuantStatsRequest) -> Dict[str, Optional[float]]:
     returns_arr = _clean_numeric_list(req.returns)
     if returns_arr.size < 2 and req.equity:
         returns_arr = _equity_to_returns(_clean_numeric_list(req.equity))
@@ -166,7 +352,7 @@ def quantstats_metrics(req: QuantStatsRequest):
         raise HTTPException(status_code=400, detail="Provide at least two clean return observations or equity points.")
 
     freq, periods_per_year = _resolve_period_settings(req.period)
-    series = _returns_series(returns_arr, freq)
+    series = _returns_series(returns_arr)
     excess_per_period = _annual_to_periodic_rate(req.risk_free_rate, periods_per_year)
     if excess_per_period:
         calmar_series = series - excess_per_period
@@ -191,28 +377,365 @@ def quantstats_metrics(req: QuantStatsRequest):
         except Exception:
             metrics[name] = None
 
-    capture("qs_calmar", lambda: qs_stats.calmar(calmar_series, periods=periods_per_year))
-    capture("qs_omega", lambda: qs_stats.omega(series))
-    capture("qs_tail_ratio", lambda: qs_stats.tail_ratio(series))
-    capture("qs_common_sense_ratio", lambda: qs_stats.common_sense_ratio(series))
-    capture("qs_value_at_risk", lambda: qs_stats.value_at_risk(series, confidence=req.confidence))
-    capture("qs_cvar", lambda: qs_stats.cvar(series, confidence=req.confidence))
-    capture("qs_ulcer_index", lambda: qs_stats.ulcer_index(series))
-    capture("qs_avg_drawdown", lambda: qs_stats.avg_drawdown(series))
-    capture("qs_avg_drawdown_days", lambda: qs_stats.avg_drawdown_days(series))
-    capture("qs_payoff_ratio", lambda: qs_stats.payoff_ratio(series))
-    capture("qs_profit_ratio", lambda: qs_stats.profit_ratio(series))
-    capture("qs_gain_to_pain_ratio", lambda: qs_stats.gain_to_pain_ratio(series))
-    capture("qs_skew", lambda: qs_stats.skew(series))
-    capture("qs_kurtosis", lambda: qs_stats.kurtosis(series))
-    capture("qs_win_rate", lambda: qs_stats.win_rate(series))
-    capture("qs_loss_rate", lambda: qs_stats.loss_rate(series))
+    # Shared passes over the returns, reused by the fused metrics below
+    values = series.to_numpy()
+    n = values.size
+    ordered = np.sort(values)
+    mean = values.mean()
+    deviations = values - mean
+    dev2 = deviations ** 2
+    m2 = dev2.sum()
+    std = math.sqrt(m2 / (n - 1))
+    negatives = ordered[:np.searchsorted(ordered, 0.0, side="left")]
+    positives_from = np.searchsorted(ordered, 0.0, side="right")
+    drawdown = _drawdown_series(values)
+    dd_depths, dd_lengths = _drawdown_episodes(drawdown)
+    calmar_values = calmar_series.to_numpy()
+    calmar_drawdown = _drawdown_series(calmar_values) if excess_per_period else drawdown
+
+    confidence = req.confidence / 100 if req.confidence > 1 else req.confidence
+    value_at_risk = norm.ppf(1 - confidence, mean, std)
+    below_var = ordered[:0]
+    if np.isfinite(value_at_risk):  # NaN for a flat series (zero std)
+        below_var = ordered[:np.searchsorted(ordered, value_at_risk, side="left")]
+    nonzero = negatives.size + (n - positives_from)
+    downside = abs(negatives.sum())
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        capture("qs_calmar", lambda: _cagr(calmar_values, periods_per_year) / abs(calmar_drawdown.min()))
+        capture("qs_omega", lambda: qs_stats.omega(series))
+        capture("qs_tail_ratio", lambda: _tail_ratio(ordered))
+        capture("qs_common_sense_ratio", lambda: qs_stats.common_sense_ratio(series))
+        capture("qs_value_at_risk", lambda: value_at_risk)
+        capture("qs_cvar", lambda: below_var.mean() if below_var.size else value_at_risk)
+        capture("qs_ulcer_index", lambda: math.sqrt((drawdown ** 2).sum() / (n - 1)))
+        # like drawdown_details: no episodes -> null, and an episode of k bars spans
+        # (k - 1) bar intervals plus its first day
+        capture("qs_avg_drawdown", lambda: dd_depths.mean() if dd_depths.size else np.nan)
+        capture(
+            "qs_avg_drawdown_days",
+            lambda: ((dd_lengths - 1) * _DAYS_PER_BAR[freq] + 1).mean() if dd_lengths.size else np.nan,
+        )
+        capture("qs_payoff_ratio", lambda: qs_stats.payoff_ratio(series))
+        capture("qs_profit_ratio", lambda: qs_stats.profit_ratio(series))
+        capture("qs_gain_to_pain_ratio", lambda: values.sum() / downside if downside else np.nan)
+        capture("qs_skew", lambda: _skew(n, m2, (dev2 * deviations).sum()))
+        capture("qs_kurtosis", lambda: _kurtosis(n, m2, (dev2 ** 2).sum()))
+        capture("qs_win_rate", lambda: (n - positives_from) / nonzero if nonzero else 0.0)
+        capture("qs_loss_rate", lambda: negatives.size / nonzero if nonzero else 0.0)
+
+    return metrics
 
+
+@app.post("/metrics/quantstats")
+async def quantstats_metrics(req: QuantStatsRequest):
+    metrics = await _run_in_pool(_compute_quantstats_metrics, req)
     return {"metrics": metrics}
 
 # ---------- Close-only indicators (existing) ----------
+# Each family maps indicator names to handlers(prices, params) -> values; multi-output
+# TA-Lib functions are registered once per output through functools.partial.
+def _price(prices: np.ndarray, params: Dict) -> np.ndarray:
+    return prices
+
+
+def _rsi(prices: np.ndarray, params: Dict) -> np.ndarray:
+    period = int(params.get("period", 14))
+    if prices.size < period:
+        raise HTTPException(status_code=400, detail="prices length must be >= period")
+    return talib.RSI(prices, timeperiod=period)
+
+
+def _sma(prices: np.ndarray, params: Dict) -> np.ndarray:
+    period = int(params.get("period", 14))
+    return talib.SMA(prices, timeperiod=period)
+
+
+def _ema(prices: np.ndarray, params: Dict) -> np.ndarray:
+    period = int(params.get("period", 14))
+    return talib.EMA(prices, timeperiod=period)
+
+
+def _macd(output: int, prices: np.ndarray, params: Dict) -> np.ndarray:
+    """output: 0 = MACD line, 1 = signal, 2 = histogram."""
+    fast = int(params.get("fastperiod", 12))
+    slow = int(params.get("slowperiod", 26))
+    signal = int(params.get("signalperiod", 9))
+    return talib.MACD(prices, fastperiod=fast, slowperiod=slow, signalperiod=signal)[output]
+
+
+def _ppo(output: int, prices: np.ndarray, params: Dict) -> np.ndarray:
+    """output: 0 = PPO line, 1 = signal (EMA of the line), 2 = histogram."""
+    fast = int(params.get("fastperiod", 12))
+    slow = int(params.get("slowperiod", 26))
+    matype = int(params.get("matype", 0))
+    ppo_line = talib.PPO(prices, fastperiod=fast, slowperiod=slow, matype=matype)
+    if output == 0:
+        return ppo_line
+    signalperiod = int(params.get("signalperiod", 9))
+    ppo_signal = talib.EMA(ppo_line, timeperiod=signalperiod)
+    if output == 1:
+        return ppo_signal
+    # ppo_line is a fresh TA-Lib output nobody else holds, so reuse it for the result
+    return np.subtract(ppo_line, ppo_signal, out=ppo_line)
+
+
+def _bbands(output: int, prices: np.ndarray, params: Dict) -> np.ndarray:
+    """output: 0 = upper, 1 = middle, 2 = lower band."""
+    period = int(params.get("period", 20))
+    nbdevup = float(params.get("nbdevup", 2.0))
+    nbdevdn = float(params.get("nbdevdn", 2.0))
+    matype = int(params.get("matype", 0))
+    return talib.BBANDS(prices, timeperiod=period, nbdevup=nbdevup, nbdevdn=nbdevdn, matype=matype)[output]
+
+
+def _cumulative_return(prices: np.ndarray, params: Dict) -> np.ndarray:
+    # Calculate cumulative return - LAGGED to avoid forward-looking bias
+    # Value at index i represents cumulative return as of EOD i-1
+    # This ensures we only use information available BEFORE making a decision on day i
+    if prices.size < 1 or prices[0] == 0:
+        raise HTTPException(status_code=400, detail="Invalid prices for cumulative return")
+
+    result = np.full(prices.size, np.nan)
+    # Shift by 1: result[i] = return from start to day i-1
+    if prices.size > 1:
+        np.divide(prices[:-1], prices[0], out=result[1:])
+        result[1:] -= 1.0
+    result[0] = 0.0  # No return before first day
+
+    return result
+
+
+def _return(prices: np.ndarray, params: Dict) -> np.ndarray:
+    # Calculate rolling period return - LAGGED to avoid forward-looking bias
+    # Value at index i represents return over the specified period ending at day i-1
+    # Example: RETURN(200) at index i = (price[i-1] / price[i-201]) - 1
+    period = int(params.get("period", 200))
+
+    if period < 1:
+        raise HTTPException(status_code=400, detail="period must be >= 1 for return calculation")
+    if prices.size < period + 1:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Need at least {period + 1} prices for {period}-day return calculation"
+        )
+
+    # result[i-1] uses prices[i-1] and prices[i-period-1] (JIT loop in _vol_loop)
+    return rolling_return(prices, period)
+
+
+def _volatility(prices: np.ndarray, params: Dict) -> np.ndarray:
+    # Calculate rolling volatility - LAGGED to avoid forward-looking bias
+    # Value at index i represents volatility using data UP TO day i-1 (not including day i)
+    # This ensures we only use returns that occurred BEFORE day i when making decisions
+    period = int(params.get("period", 20))
+    annualize = params.get("annualize", "true").lower() == "true"
+
+    if period < 2:
+        raise HTTPException(status_code=400, detail="period must be >= 2 for volatility calculation")
+    if prices.size < period + 1:
+        raise HTTPException(status_code=400, detail=f"Need at least {period + 1} prices for volatility calculation")
+
+    # Returns are return[j] = (price[j+1] - price[j]) / price[j]; the rolling std over
+    # returns[j-period+1:j+1] lands on result[j+2] so result[i] only uses data through day i-1.
+    # Annualize if requested (assuming daily data)
+    annualize_factor = math.sqrt(252) if annualize else 1.0
+    return rolling_vol(prices, period, annualize_factor)
+
+
+CLOSE_ONLY_HANDLERS: Dict[str, Callable[[np.ndarray, Dict], np.ndarray]] = {
+    "CURRENT_PRICE": _price,
+    "PRICE": _price,
+    "CLOSE": _price,
+    "LAST": _price,
+    "RSI": _rsi,
+    "SMA": _sma,
+    "EMA": _ema,
+    "MACD": functools.partial(_macd, 2),
+    "MACD_HIST": functools.partial(_macd, 2),
+    "MACD-HIST": functools.partial(_macd, 2),
+    "MACD_LINE": functools.partial(_macd, 0),
+    "MACD_SIGNAL": functools.partial(_macd, 1),
+    "PPO": functools.partial(_ppo, 0),
+    "PPO_LINE": functools.partial(_ppo, 0),
+    "PPO_SIGNAL": functools.partial(_ppo, 1),
+    "PPO_HIST": functools.partial(_ppo, 2),
+    "BBANDS_UPPER": functools.partial(_bbands, 0),
+    "BBANDS_MIDDLE": functools.partial(_bbands, 1),
+    "BBANDS_LOWER": functools.partial(_bbands, 2),
+    "CUMULATIVE_RETURN": _cumulative_return,
+    "RETURN": _return,
+    "VOLATILITY": _volatility,
+}
+
+
+def _close_only_indicator(ind: str, prices: np.ndarray, params: Dict) -> np.ndarray:
+    handler = CLOSE_ONLY_HANDLERS.get(ind)
+    if handler is None:
+        raise HTTPException(status_code=400, detail=f"Unsupported close-only indicator '{ind}'")
+    return handler(prices, params)
+
+
+# ---------- HLC indicators ----------
+def _adx(high: np.ndarray, low: np.ndarray, close: np.ndarray, params: Dict) -> np.ndarray:
+    period = int(params.get("period", 14))
+    return talib.ADX(high, low, close, timeperiod=period)
+
+
+def _stoch_k(high: np.ndarray, low: np.ndarray, close: np.ndarray, params: Dict) -> np.ndarray:
+    # return slow %K
+    fastk = int(params.get("fastk_period", 14))
+    slowk = int(params.get("slowk_period", 3))
+    slowd = int(params.get("slowd_period", 3))
+    slowk_matype = int(params.get("slowk_matype", 0))
+    slowd_matype = int(params.get("slowd_matype", 0))
+    slowk_arr, slowd_arr = talib.STOCH(
+        high, low, close,
+        fastk_period=fastk,
+        slowk_period=slowk, slowk_matype=slowk_matype,
+        slowd_period=slowd, slowd_matype=slowd_matype
+    )
+    return slowk_arr
+
+
+def _aroon(output: int, high: np.ndarray, low: np.ndarray, close: np.ndarray, params: Dict) -> np.ndarray:
+    """output: 0 = Aroon down, 1 = Aroon up."""
+    period = int(params.get("period", 14))
+    return talib.AROON(high, low, timeperiod=period)[output]
+
+
+def _aroonosc(high: np.ndarray, low: np.ndarray, close: np.ndarray, params: Dict) -> np.ndarray:
+    period = int(params.get("period", 14))
+    return talib.AROONOSC(high, low, timeperiod=period)
+
+
+def _willr(high: np.ndarray, low: np.ndarray, close: np.ndarray, params: Dict) -> np.ndarray:
+    period = int(params.get("period", 14))
+    return talib.WILLR(high, low, close, timeperiod=period)
+
+
+def _cci(high: np.ndarray, low: np.ndarray, close: np.ndarray, params: Dict) -> np.ndarray:
+    period = int(params.get("period", 14))
+    return talib.CCI(high, low, close, timeperiod=period)
+
+
+def _natr(high: np.ndarray, low: np.ndarray, close: np.ndarray, params: Dict) -> np.ndarray:
+    period = int(params.get("period", 14))
+    return talib.NATR(high, low, close, timeperiod=period)
+
+
+def _atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, params: Dict) -> np.ndarray:
+    period = int(params.get("period", 14))
+    return talib.ATR(high, low, close, timeperiod=period)
+
+
+HLC_HANDLERS: Dict[str, Callable[..., np.ndarray]] = {
+    "ADX": _adx,
+    "STOCH_K": _stoch_k,
+    "AROON_UP": functools.partial(_aroon, 1),
+    "AROON_DOWN": functools.partial(_aroon, 0),
+    "AROONOSC": _aroonosc,
+    "WILLR": _willr,
+    "CCI": _cci,
+    "NATR": _natr,
+    "ATR": _atr,
+}
+
+
+def _hlc_indicator(ind: str, high: np.ndarray, low: np.ndarray, close: np.ndarray, params: Dict) -> np.ndarray:
+    handler = HLC_HANDLERS.get(ind)
+    if handler is None:
+        raise HTTPException(status_code=400, detail=f"Unsupported HLC indicator '{ind}'")
+    return handler(high, low, close, params)
+
+
+# ---------- HLCV indicators ----------
+def _mfi(high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray, params: Dict) -> np.ndarray:
+    period = int(params.get("period", 14))
+    return talib.MFI(high, low, close, volume, timeperiod=period)
+
+
+def _ad(high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray, params: Dict) -> np.ndarray:
+    return talib.AD(high, low, close, volume)
+
+
+def _adosc(high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray, params: Dict) -> np.ndarray:
+    fast = int(params.get("fastperiod", 3))
+    slow = int(params.get("slowperiod", 10))
+    return talib.ADOSC(high, low, close, volume, fastperiod=fast, slowperiod=slow)
+
+
+HLCV_HANDLERS: Dict[str, Callable[..., np.ndarray]] = {
+    "MFI": _mfi,
+    "AD": _ad,
+    "ADOSC": _adosc,
+}
+
+
+def _hlcv_indicator(ind: str, high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray, params: Dict) -> np.ndarray:
+    handler = HLCV_HANDLERS.get(ind)
+    if handler is None:
+        raise HTTPException(status_code=400, detail=f"Unsupported HLCV indicator '{ind}'")
+    return handler(high, low, close, volume, params)
+
+
+# ---------- Close + Volume indicators (legacy OBV) ----------
+def _obv(close: np.ndarray, volume: np.ndarray, params: Dict) -> np.ndarray:
+    return talib.OBV(close, volume)
+
+
+CLOSE_VOLUME_HANDLERS: Dict[str, Callable[..., np.ndarray]] = {
+    "OBV": _obv,
+}
+
+
+def _close_volume_indicator(ind: str, close: np.ndarray, volume: np.ndarray, params: Dict) -> np.ndarray:
+    handler = CLOSE_VOLUME_HANDLERS.get(ind)
+    if handler is None:
+        raise HTTPException(status_code=400, detail=f"Unsupported Close+Volume indicator '{ind}'")
+    return handler(close, volume, params)
+
+
+def _indicator_series(payload: dict) -> tuple:
+    """Pick the input shape from the fields present: (shape indicator function, arrays)."""
+    # ---- Close-only path ----
+    if "prices" in payload:
+        prices = _payload_array(payload, "prices")
+        if prices.size < 2:
+            raise HTTPException(status_code=400, detail="prices must contain at least 2 values")
+        return _close_only_indicator, (prices,)
+
+    # ---- HLC path (new) ----
+    if all(k in payload for k in ("high", "low", "close")) and "volume" not in payload:
+        return _hlc_indicator, tuple(_payload_array(payload, k) for k in ("high", "low", "close"))
+
+    # ---- HLCV path (new) ----
+    if all(k in payload for k in ("high", "low", "close", "volume")):
+        return _hlcv_indicator, tuple(_payload_array(payload, k) for k in ("high", "low", "close", "volume"))
+
+    # ---- Close + Volume path (legacy OBV) ----
+    if all(k in payload for k in ("close", "volume")) and "high" not in payload:
+        return _close_volume_indicator, (_payload_array(payload, "close"), _payload_array(payload, "volume"))
+
+    raise HTTPException(status_code=400, detail="Malformed request: missing required fields")
+
+
+def _compute_indicator(payload: dict, series: Optional[tuple] = None, series_key: Optional[tuple] = None) -> np.ndarray:
+    """
+    Synchronous body of /indicator; runs on CPU_POOL. /indicator/batch passes the
+    already parsed `series` and its `series_key` so each spec skips both.
+    """
+    ind = (payload.get("indicator") or "").upper().strip()
+    params = _payload_params(payload)
+    indicator, arrays = series or _indicator_series(payload)
+
+    if indicator is _close_only_indicator and CLOSE_ONLY_HANDLERS.get(ind) is _price:
+        return arrays[0]  # passthrough: nothing to hash, cache or scan
+    return _cached_values(ind, params, arrays, lambda: indicator(ind, *arrays, params), series_key)
+
+
 @app.post("/indicator")
-def indicator_router(payload: dict):
+async def indicator_router(payload: dict):
     """
     Single endpoint that dispatches based on fields present.
     - Close-only: {"prices":[...]}
@@ -220,253 +743,247 @@ def indicator_router(payload: dict):
     - HLCV: {"high":[...], "low":[...], "close":[...], "volume":[...]}
     - Close+Volume: {"close":[...], "volume":[...]}
     """
-    ind = (payload.get("indicator") or "").upper().strip()
+    values = await _run_in_pool(_compute_indicator, payload)
+    return _values_response("values", values)
 
-    # ---- Close-only path ----
-    if "prices" in payload:
-        req = CloseOnlyReq(**payload)
-        prices = _as_nd(req.prices)
 
-        if prices.size < 2:
-            raise HTTPException(status_code=400, detail="prices must contain at least 2 values")
+@app.post("/indicator/bin")
+async def indicator_bin(request: Request):
+    """
+    Binary variant of /indicator for high-volume callers. The body is a msgpack map
+    with the same fields, where each array may be raw little-endian float64 bytes;
+    the response is a msgpack map {"values": <float64 bytes>} (NaN where undefined).
+    """
+    try:
+        payload = msgpack.unpackb(await request.body(), raw=False)
+    except (ValueError, msgpack.UnpackException):
+        raise HTTPException(status_code=400, detail="body must be a msgpack map")
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=400, detail="body must be a msgpack map")
 
-        if ind == "CURRENT_PRICE" or ind in ("PRICE", "CLOSE", "LAST"):
-            return {"values": _nan_to_none(prices)}
-
-        if ind == "RSI":
-            period = int(req.params.get("period", 14))
-            if prices.size < period:
-                raise HTTPException(status_code=400, detail="prices length must be >= period")
-            out = talib.RSI(prices, timeperiod=period)
-            return {"values": _nan_to_none(out)}
-
-        if ind == "SMA":
-            period = int(req.params.get("period", 14))
-            out = talib.SMA(prices, timeperiod=period)
-            return {"values": _nan_to_none(out)}
-
-        if ind == "EMA":
-            period = int(req.params.get("period", 14))
-            out = talib.EMA(prices, timeperiod=period)
-            return {"values": _nan_to_none(out)}
-
-        if ind in ("MACD", "MACD_HIST", "MACD-HIST", "MACD_LINE", "MACD_SIGNAL"):
-            fast = int(req.params.get("fastperiod", 12))
-            slow = int(req.params.get("slowperiod", 26))
-            signal = int(req.params.get("signalperiod", 9))
-            macd, macd_signal, macd_hist = talib.MACD(prices, fastperiod=fast, slowperiod=slow, signalperiod=signal)
-            if ind in ("MACD", "MACD_HIST", "MACD-HIST"):
-                return {"values": _nan_to_none(macd_hist)}
-            if ind == "MACD_LINE":
-                return {"values": _nan_to_none(macd)}
-            if ind == "MACD_SIGNAL":
-                return {"values": _nan_to_none(macd_signal)}
-
-        if ind in ("PPO", "PPO_LINE", "PPO_SIGNAL", "PPO_HIST"):
-            fast = int(req.params.get("fastperiod", 12))
-            slow = int(req.params.get("slowperiod", 26))
-            matype = int(req.params.get("matype", 0))
-            ppo_line = talib.PPO(prices, fastperiod=fast, slowperiod=slow, matype=matype)
-            if ind in ("PPO", "PPO_LINE"):
-                return {"values": _nan_to_none(ppo_line)}
-            signalperiod = int(req.params.get("signalperiod", 9))
-            ppo_signal = talib.EMA(ppo_line, timeperiod=signalperiod)
-            if ind == "PPO_SIGNAL":
-                return {"values": _nan_to_none(ppo_signal)}
-            if ind == "PPO_HIST":
-                hist = ppo_line - ppo_signal
-                return {"values": _nan_to_none(hist)}
-
-        if ind in ("BBANDS_UPPER", "BBANDS_MIDDLE", "BBANDS_LOWER"):
-            period = int(req.params.get("period", 20))
-            nbdevup = float(req.params.get("nbdevup", 2.0))
-            nbdevdn = float(req.params.get("nbdevdn", 2.0))
-            matype = int(req.params.get("matype", 0))
-            upper, middle, lower = talib.BBANDS(prices, timeperiod=period, nbdevup=nbdevup, nbdevdn=nbdevdn, matype=matype)
-            if ind == "BBANDS_UPPER":
-                return {"values": _nan_to_none(upper)}
-            if ind == "BBANDS_MIDDLE":
-                return {"values": _nan_to_none(middle)}
-            if ind == "BBANDS_LOWER":
-                return {"values": _nan_to_none(lower)}
-
-        if ind == "CUMULATIVE_RETURN":
-            # Calculate cumulative return - LAGGED to avoid forward-looking bias
-            # Value at index i represents cumulative return as of EOD i-1
-            # This ensures we only use information available BEFORE making a decision on day i
-            if prices.size < 1 or prices[0] == 0:
-                raise HTTPException(status_code=400, detail="Invalid prices for cumulative return")
-
-            result = np.full(prices.size, np.nan)
-            # Shift by 1: result[i] = return from start to day i-1
-            if prices.size > 1:
-                result[1:] = (prices[:-1] / prices[0]) - 1.0
-            result[0] = 0.0  # No return before first day
-
-            return {"values": _nan_to_none(result)}
-
-        if ind == "RETURN":
-            # Calculate rolling period return - LAGGED to avoid forward-looking bias
-            # Value at index i represents return over the specified period ending at day i-1
-            # Example: RETURN(200) at index i = (price[i-1] / price[i-201]) - 1
-            period = int(req.params.get("period", 200))
-
-            if prices.size < period + 1:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Need at least {period + 1} prices for {period}-day return calculation"
-                )
-
-            result = np.full(prices.size, np.nan)
-
-            # Calculate rolling returns, lagged by 1 day
-            for i in range(period + 1, prices.size + 1):
-                # result[i] uses prices[i-1] and prices[i-period-1]
-                # This ensures we only use data available BEFORE day i
-                if prices[i - period - 1] > 0:
-                    result[i - 1] = (prices[i - 1] / prices[i - period - 1]) - 1.0
-
-            return {"values": _nan_to_none(result)}
-
-        if ind == "VOLATILITY":
-            # Calculate rolling volatility - LAGGED to avoid forward-looking bias
-            # Value at index i represents volatility using data UP TO day i-1 (not including day i)
-            # This ensures we only use returns that occurred BEFORE day i when making decisions
-            period = int(req.params.get("period", 20))
-            annualize = req.params.get("annualize", "true").lower() == "true"
-
-            if prices.size < period + 1:
-                raise HTTPException(status_code=400, detail=f"Need at least {period + 1} prices for volatility calculation")
-
-            # Calculate returns: return[i] = (price[i+1] - price[i]) / price[i]
-            returns = np.diff(prices) / prices[:-1]
-
-            # Calculate rolling standard deviation using pandas
-            returns_series = pd.Series(returns)
-            rolling_vol = returns_series.rolling(window=period).std().values
-
-            # Annualize if requested (assuming daily data)
-            if annualize:
-                rolling_vol = rolling_vol * np.sqrt(252)
-
-            # Align to prices: result[i] uses returns up to day i-1
-            # rolling_vol[j] uses returns[j-period+1:j+1] (j is in returns space, 1 shorter than prices)
-            # We want result[i] to use rolling_vol calculated through day i-1
-            # So result[i] should get rolling_vol[i-2] (which used returns through index i-2, i.e. day i-1)
-            result = np.full(prices.size, np.nan)
-            if prices.size > period:
-                # Shift by 1 day to avoid forward-looking bias
-                result[period:] = rolling_vol[period-2:-1]
-
-            return {"values": _nan_to_none(result)}
-
-        # Unsupported close-only
-        raise HTTPException(status_code=400, detail=f"Unsupported close-only indicator '{ind}'")
+    values = await _run_in_pool(_compute_indicator, payload)
+    body = msgpack.packb({"values": np.ascontiguousarray(values, dtype="<f8").tobytes()})
+    return Response(content=body, media_type="application/x-msgpack")
 
-    # ---- HLC path (new) ----
-    if all(k in payload for k in ("high", "low", "close")) and "volume" not in payload:
-        req = HLCReq(**payload)
-        high, low, close = _as_nd(req.high), _as_nd(req.low), _as_nd(req.close)
-
-        if ind == "ADX":
-            period = int(req.params.get("period", 14))
-            out = talib.ADX(high, low, close, timeperiod=period)
-            return {"values": _nan_to_none(out)}
-
-        if ind == "STOCH_K":  # return slow %K
-            fastk = int(req.params.get("fastk_period", 14))
-            slowk = int(req.params.get("slowk_period", 3))
-            slowd = int(req.params.get("slowd_period", 3))
-            slowk_matype = int(req.params.get("slowk_matype", 0))
-            slowd_matype = int(req.params.get("slowd_matype", 0))
-            slowk_arr, slowd_arr = talib.STOCH(
-                high, low, close,
-                fastk_period=fastk,
-                slowk_period=slowk, slowk_matype=slowk_matype,
-                slowd_period=slowd, slowd_matype=slowd_matype
-            )
-            return {"values": _nan_to_none(slowk_arr)}
-
-        if ind in ("AROON_UP", "AROON_DOWN"):
-            period = int(req.params.get("period", 14))
-            aroondown, aroonup = talib.AROON(high, low, timeperiod=period)
-            if ind == "AROON_UP":
-                return {"values": _nan_to_none(aroonup)}
-            if ind == "AROON_DOWN":
-                return {"values": _nan_to_none(aroondown)}
-
-        if ind == "AROONOSC":
-            period = int(req.params.get("period", 14))
-            out = talib.AROONOSC(high, low, timeperiod=period)
-            return {"values": _nan_to_none(out)}
-
-        if ind == "WILLR":
-            period = int(req.params.get("period", 14))
-            out = talib.WILLR(high, low, close, timeperiod=period)
-            return {"values": _nan_to_none(out)}
-
-        if ind == "CCI":
-            period = int(req.params.get("period", 14))
-            out = talib.CCI(high, low, close, timeperiod=period)
-            return {"values": _nan_to_none(out)}
-
-        if ind == "NATR":
-            period = int(req.params.get("period", 14))
-            out = talib.NATR(high, low, close, timeperiod=period)
-            return {"values": _nan_to_none(out)}
-
-        if ind == "ATR":
-            period = int(req.params.get("period", 14))
-            out = talib.ATR(high, low, close, timeperiod=period)
-            return {"values": _nan_to_none(out)}
 
-        raise HTTPException(status_code=400, detail=f"Unsupported HLC indicator '{ind}'")
+_BATCH_MAX_SPECS = 256  # keeps one batch from queueing ahead of all other traffic
 
-    # ---- HLCV path (new) ----
-    if all(k in payload for k in ("high", "low", "close", "volume")):
-        req = HLCVReq(**payload)
-        high, low, close, volume = _as_nd(req.high), _as_nd(req.low), _as_nd(req.close), _as_nd(req.volume)
 
-        if ind == "MFI":
-            period = int(req.params.get("period", 14))
-            out = talib.MFI(high, low, close, volume, timeperiod=period)
-            return {"values": _nan_to_none(out)}
+def _batch_series(payload: dict) -> tuple:
+    specs = payload.get("specs")
+    if not isinstance(specs, list) or not all(isinstance(spec, dict) for spec in specs):
+        raise HTTPException(status_code=422, detail="specs must be a list of objects")
+    if len(specs) > _BATCH_MAX_SPECS:
+        raise HTTPException(status_code=422, detail=f"specs must contain at most {_BATCH_MAX_SPECS} entries")
+    series = _indicator_series(payload)
+    return series, _series_key(series[1])
 
-        if ind == "AD":
-            out = talib.AD(high, low, close, volume)
-            return {"values": _nan_to_none(out)}
 
-        if ind == "ADOSC":
-            fast = int(req.params.get("fastperiod", 3))
-            slow = int(req.params.get("slowperiod", 10))
-            out = talib.ADOSC(high, low, close, volume, fastperiod=fast, slowperiod=slow)
-            return {"values": _nan_to_none(out)}
+@app.post("/indicator/batch")
+async def indicator_batch(payload: dict):
+    """
+    Several indicators over the same series in one request. Series fields are the same
+    as /indicator; each spec is {"indicator": ..., "params": {...}}.
+    Returns {"results": [values, ...]} in spec order.
+    """
+    # parse and hash the shared arrays once, then fan the specs out over CPU_POOL
+    series, series_key = await _run_in_pool(_batch_series, payload)
+    results = await asyncio.gather(*(
+        _run_in_pool(_compute_indicator, spec, series, series_key)
+        for spec in payload["specs"]
+    ))
+    return ORJSONResponse({"results": [np.ascontiguousarray(values, dtype="float64") for values in results]})
+
+
+# ---------- Streaming indicators ----------
+# Live callers poll with one new price appended, so /indicator/stream keeps each
+# session's running state and applies O(1) updates instead of recomputing the series.
+# talib.stream is not used: it only sees the lookback window, so its RSI/EMA drift from
+# the full-history values /indicator returns.
+#
+# Session state lives in a SQLite file rather than process memory so that every uvicorn
+# worker of an instance sees the same sessions (see WORKERS). It is scratch state: no
+# fsync, and a lost file just means clients get a 404 and seed again.
+_STREAM_DB_PATH = os.environ.get("STREAM_DB", os.path.join(tempfile.gettempdir(), "indicator-stream.sqlite3"))
+_STREAM_SESSIONS_MAX = 4096
+
+_stream_local = threading.local()
+
+
+def _stream_db() -> sqlite3.Connection:
+    conn = getattr(_stream_local, "conn", None)
+    if conn is None:
+        # one connection per CPU_POOL thread; transactions are managed explicitly
+        conn = sqlite3.connect(_STREAM_DB_PATH, timeout=5.0, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=OFF")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS stream_sessions "
+            "(id TEXT PRIMARY KEY, state BLOB NOT NULL, touched INTEGER NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS stream_sessions_touched ON stream_sessions (touched)")
+        _stream_local.conn = conn
+    return conn
+
+
+@contextlib.contextmanager
+def _stream_transaction():
+    conn = _stream_db()
+    conn.execute("BEGIN IMMEDIATE")  # take the write lock up front so read-modify-write is atomic
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+def _rsi_from_averages(avg_gain: float, avg_loss: float) -> float:
+    total = avg_gain + avg_loss
+    if math.isnan(total):
+        return math.nan  # a NaN in the seed poisons the averages, as in talib.RSI
+    return 100.0 * (avg_gain / total) if abs(total) >= 1e-8 else 0.0  # TA_IS_ZERO
+
+
+def _rsi_stream_seed(prices: np.ndarray, period: int) -> tuple:
+    avg_gain, avg_loss = wilder_averages(prices, period)
+    state = {"period": period, "last": float(prices[-1]), "avg_gain": avg_gain, "avg_loss": avg_loss}
+    return state, _rsi_from_averages(avg_gain, avg_loss)
+
+
+def _rsi_stream_update(state: dict, price: float) -> float:
+    period = state["period"]
+    change = price - state["last"]
+    state["last"] = price
+    avg_gain = state["avg_gain"] * (period - 1)
+    avg_loss = state["avg_loss"] * (period - 1)
+    if change < 0:
+        avg_loss -= change
+    else:
+        avg_gain += change
+    state["avg_gain"] = avg_gain = avg_gain / period
+    state["avg_loss"] = avg_loss = avg_loss / period
+    return _rsi_from_averages(avg_gain, avg_loss)
 
-        raise HTTPException(status_code=400, detail=f"Unsupported HLCV indicator '{ind}'")
 
-    # ---- Close + Volume path (legacy OBV) ----
-    if all(k in payload for k in ("close", "volume")) and "high" not in payload:
-        req = CloseVolumeReq(**payload)
-        close, volume = _as_nd(req.close), _as_nd(req.volume)
+def _sma_stream_seed(prices: np.ndarray, period: int) -> tuple:
+    state = {"period": period, "window": prices[-period:].tolist()}
+    return state, float(talib.SMA(prices, timeperiod=period)[-1])
 
-        if ind == "OBV":
-            out = talib.OBV(close, volume)
-            return {"values": _nan_to_none(out)}
 
-        raise HTTPException(status_code=400, detail=f"Unsupported Close+Volume indicator '{ind}'")
+def _sma_stream_update(state: dict, price: float) -> float:
+    window = state["window"]
+    window.append(price)
+    del window[0]
+    return math.fsum(window) / state["period"]
 
-    raise HTTPException(status_code=400, detail="Malformed request: missing required fields")
 
-@app.post("/rsi")
-def rsi(req: RSIRequest):
+def _ema_stream_seed(prices: np.ndarray, period: int) -> tuple:
+    ema = float(talib.EMA(prices, timeperiod=period)[-1])
+    return {"k": 2.0 / (period + 1), "ema": ema}, ema
+
+
+def _ema_stream_update(state: dict, price: float) -> float:
+    state["ema"] = ema = (price - state["ema"]) * state["k"] + state["ema"]
+    return ema
+
+
+STREAM_HANDLERS: Dict[str, tuple] = {
+    "RSI": (_rsi_stream_seed, _rsi_stream_update),
+    "SMA": (_sma_stream_seed, _sma_stream_update),
+    "EMA": (_ema_stream_seed, _ema_stream_update),
+}
+
+
+def _seed_stream(session: str, payload: dict) -> float:
+    ind = (payload.get("indicator") or "").upper().strip()
+    handlers = STREAM_HANDLERS.get(ind)
+    if handlers is None:
+        raise HTTPException(status_code=400, detail=f"Unsupported streaming indicator '{ind}'")
+    params = _payload_params(payload)
+    prices = _payload_array(payload, "prices")
+    period = int(params.get("period", 14))
+    if period < 2:
+        raise HTTPException(status_code=400, detail="period must be >= 2")
+    if prices.size <= period:
+        raise HTTPException(status_code=400, detail=f"Need at least {period + 1} prices to seed a {ind} stream")
+
+    state, value = handlers[0](prices, period)
+    state["indicator"] = ind
+    with _stream_transaction() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO stream_sessions (id, state, touched) VALUES (?, ?, ?)",
+            (session, msgpack.packb(state), time.time_ns()),
+        )
+        # evict least-recently-used sessions beyond the cap
+        conn.execute(
+            "DELETE FROM stream_sessions WHERE touched < "
+            "(SELECT touched FROM stream_sessions ORDER BY touched DESC LIMIT 1 OFFSET ?)",
+            (_STREAM_SESSIONS_MAX - 1,),
+        )
+    return value
+
+
+def _update_stream(session: str, price: Any) -> float:
+    # JSON numbers only: float() would also take true/false and numeric strings
+    is_number = isinstance(price, (int, float)) and not isinstance(price, bool)
+    try:
+        price = float(price) if is_number else math.nan
+    except OverflowError:  # an integer literal beyond float range
+        price = math.nan
+    if not math.isfinite(price):
+        raise HTTPException(status_code=422, detail="price must be a finite number")
+    with _stream_transaction() as conn:
+        row = conn.execute("SELECT state FROM stream_sessions WHERE id = ?", (session,)).fetchone()
+        if row is None:
+            raise HTTPException(status_code=404, detail=f"Unknown stream session '{session}'; seed it with prices")
+        state = msgpack.unpackb(row[0])
+        value = STREAM_HANDLERS[state["indicator"]][1](state, price)
+        conn.execute(
+            "UPDATE stream_sessions SET state = ?, touched = ? WHERE id = ?",
+            (msgpack.packb(state), time.time_ns(), session),
+        )
+    return value
+
+
+@app.post("/indicator/stream")
+async def indicator_stream(payload: dict):
+    """
+    Incremental RSI/SMA/EMA for live polling.
+    - Seed (or re-seed): {"session": "...", "indicator": "RSI", "params": {...}, "prices": [...]}
+    - Update: {"session": "...", "price": 101.25}
+    Both return {"value": latest}. Sessions are shared by all workers of the instance and
+    evicted least-recently-used, so an update for an unknown session returns 404 and the
+    client should seed again.
+    """
+    session = payload.get("session")
+    if not isinstance(session, str) or not session:
+        raise HTTPException(status_code=422, detail="session must be a non-empty string")
+
+    if "prices" in payload:
+        value = await _run_in_pool(_seed_stream, session, payload)
+    elif "price" in payload:
+        value = await _run_in_pool(_update_stream, session, payload["price"])  # may wait on the DB lock
+    else:
+        raise HTTPException(status_code=400, detail="Malformed request: expected prices or price")
+    return {"value": value if math.isfinite(value) else None}
+
+
+def _compute_rsi(req: RSIRequest) -> np.ndarray:
     arr = _as_nd(req.values)
-    out = talib.RSI(arr, timeperiod=req.period)
-    return {"rsi": _nan_to_none(out)}
+    return talib.RSI(arr, timeperiod=req.period)
+
+
+@app.post("/rsi")
+async def rsi(req: RSIRequest):
+    out = await _run_in_pool(_compute_rsi, req)
+    return _values_response("rsi", out)
 # ====================== END: CODE BLOCK A — FastAPI TA-Lib Service ======================
 
 if __name__ == "__main__":
-    import os
+    # Single process for local runs: serve the already imported app instead of
+    # re-importing it by string. Deployments use serve.py for multiple workers.
     import uvicorn
 
     port = int(os.environ.get("PORT", 8001))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    uvicorn.run(app, host="0.0.0.0", port=port, loop="uvloop", http="httptools")
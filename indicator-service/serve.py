@@ -0,0 +1,16 @@
+"""
+Production launcher: `python serve.py`.
+
+Starts the uvicorn workers without importing app.py here, so the supervisor process
+stays a bare uvicorn (~25 MB) instead of a third copy of pandas, scipy, quantstats,
+numba and TA-Lib. WORKERS is exported so each worker sizes its CPU_POOL to match.
+"""
+import os
+
+import uvicorn
+
+
+if __name__ == "__main__":
+    workers = int(os.environ.setdefault("WORKERS", "2"))
+    port = int(os.environ.get("PORT", 8001))
+    uvicorn.run("app:app", host="0.0.0.0", port=port, workers=workers, loop="uvloop", http="httptools")
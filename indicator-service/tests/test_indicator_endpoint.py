@@ -0,0 +1,328 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import msgpack
+import numpy as np
+import pandas as pd
+import talib
+from fastapi.testclient import TestClient
+
+# keep /indicator/stream sessions out of the default database a local service may be
+# using; must be set before app is imported (the stream subprocess inherits it)
+_STREAM_DB_DIR = tempfile.mkdtemp(prefix="indicator-stream-test-")
+os.environ["STREAM_DB"] = os.path.join(_STREAM_DB_DIR, "stream.sqlite3")
+
+import _vol_loop  # noqa: E402
+import app as app_module  # noqa: E402
+from app import app  # noqa: E402
+
+
+def tearDownModule():
+    shutil.rmtree(_STREAM_DB_DIR, ignore_errors=True)
+
+
+def _sample_prices(n=120, seed=7):
+    rng = np.random.default_rng(seed)
+    return (100 * np.cumprod(1 + rng.normal(0, 0.01, n))).tolist()
+
+
+class IndicatorEndpointTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.client = TestClient(app)
+
+    def post_indicator(self, payload):
+        response = self.client.post("/indicator", json=payload)
+        self.assertEqual(response.status_code, 200, msg=response.text)
+        return response.json()["values"]
+
+
+class IndicatorCacheTests(IndicatorEndpointTestCase):
+    def setUp(self):
+        app_module._clear_indicator_cache()
+
+    def test_repeated_request_is_served_from_cache(self):
+        payload = {"indicator": "RSI", "prices": _sample_prices(), "params": {"period": 14}}
+        first = self.post_indicator(payload)
+
+        with mock.patch.object(app_module.talib, "RSI", side_effect=AssertionError("cache miss")):
+            second = self.post_indicator(payload)
+
+        self.assertEqual(first, second)
+        expected = talib.RSI(np.array(payload["prices"]), timeperiod=14)
+        self.assertIsNone(first[0])
+        self.assertAlmostEqual(first[-1], float(expected[-1]), places=9)
+
+    def test_cache_key_includes_params_and_prices(self):
+        prices = _sample_prices()
+        rsi_14 = self.post_indicator({"indicator": "RSI", "prices": prices, "params": {"period": 14}})
+        rsi_7 = self.post_indicator({"indicator": "RSI", "prices": prices, "params": {"period": 7}})
+        shifted = self.post_indicator({"indicator": "RSI", "prices": prices[1:] + prices[:1], "params": {"period": 14}})
+
+        self.assertNotEqual(rsi_14, rsi_7)
+        self.assertNotEqual(rsi_14, shifted)
+        self.assertEqual(len(app_module._indicator_cache), 3)
+
+    def test_price_passthrough_skips_cache(self):
+        prices = _sample_prices(50)
+        values = self.post_indicator({"indicator": "CURRENT_PRICE", "prices": prices})
+
+        self.assertEqual(values, prices)
+        self.assertEqual(len(app_module._indicator_cache), 0)
+
+    def test_cache_stays_under_byte_budget(self):
+        prices = _sample_prices(1000)
+        with mock.patch.object(app_module, "_INDICATOR_CACHE_MAX_BYTES", 3 * 8000):
+            for period in range(5, 10):
+                self.post_indicator({"indicator": "SMA", "prices": prices, "params": {"period": period}})
+
+            self.assertEqual(len(app_module._indicator_cache), 3)
+            self.assertEqual(app_module._indicator_cache_bytes, 3 * 8000)
+            # least recently used entries went first
+            self.assertEqual([key[1] for key in app_module._indicator_cache], [(("period", repr(p)),) for p in (7, 8, 9)])
+
+    def test_errors_are_not_cached(self):
+        payload = {"indicator": "RSI", "prices": _sample_prices(10), "params": {"period": 14}}
+        response = self.client.post("/indicator", json=payload)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(len(app_module._indicator_cache), 0)
+
+
+class CustomIndicatorTests(IndicatorEndpointTestCase):
+    def test_volatility_matches_lagged_pandas_rolling_std(self):
+        prices = np.array(_sample_prices(80))
+        period = 10
+        returns = np.diff(prices) / prices[:-1]
+        rolling = pd.Series(returns).rolling(window=period).std().values * np.sqrt(252)
+        expected = np.full(prices.size, np.nan)
+        expected[period:] = rolling[period - 2:-1]
+
+        values = self.post_indicator({"indicator": "VOLATILITY", "prices": prices.tolist(), "params": {"period": period}})
+        actual = np.array([np.nan if v is None else v for v in values])
+
+        np.testing.assert_array_equal(np.isnan(actual), np.isnan(expected))
+        np.testing.assert_allclose(actual, expected, rtol=1e-9)
+
+    def test_volatility_kernels_match_pandas_with_zero_price(self):
+        prices = np.array(_sample_prices(80))
+        prices[30] = 0.0  # -100% return, then an infinite one
+        period = 10
+        with np.errstate(divide="ignore", invalid="ignore"):
+            returns = np.diff(prices) / prices[:-1]
+        returns[~np.isfinite(returns)] = np.nan
+        rolling = pd.Series(returns).rolling(window=period).std().values * 2.0
+        expected = np.full(prices.size, np.nan)
+        expected[period:] = rolling[period - 2:-1]
+
+        for numba_available in (True, False):
+            with mock.patch.object(_vol_loop, "NUMBA_AVAILABLE", numba_available):
+                actual = _vol_loop.rolling_vol(prices, period, 2.0)
+            np.testing.assert_array_equal(np.isnan(actual), np.isnan(expected), err_msg=f"numba={numba_available}")
+            np.testing.assert_allclose(actual, expected, rtol=1e-9, err_msg=f"numba={numba_available}")
+
+    def test_volatility_rejects_period_below_two(self):
+        payload = {"indicator": "VOLATILITY", "prices": _sample_prices(30), "params": {"period": 1}}
+        response = self.client.post("/indicator", json=payload)
+        self.assertEqual(response.status_code, 400)
+
+    def test_malformed_arrays_are_rejected(self):
+        malformed = ("abc", "9876543210", [1.0, "x", 3.0], [[1.0, 2.0], [3.0, 4.0]], {"a": 1}, {"101": 1, "102": 2, "99": 3})
+        for prices in malformed:
+            response = self.client.post("/indicator", json={"indicator": "SMA", "prices": prices})
+            self.assertEqual(response.status_code, 422, msg=f"{prices!r}: {response.text}")
+
+        response = self.client.post("/indicator", json={"indicator": "SMA", "prices": [1.0, 2.0], "params": [3]})
+        self.assertEqual(response.status_code, 422)
+
+    def test_return_rejects_non_positive_period(self):
+        for period in (0, -3, -100000000):
+            payload = {"indicator": "RETURN", "prices": _sample_prices(10), "params": {"period": period}}
+            response = self.client.post("/indicator", json=payload)
+            self.assertEqual(response.status_code, 400, msg=f"period {period}: {response.text}")
+
+    def test_return_uses_period_offset(self):
+        prices = _sample_prices(40)
+        values = self.post_indicator({"indicator": "RETURN", "prices": prices, "params": {"period": 5}})
+
+        self.assertTrue(all(v is None for v in values[:5]))
+        self.assertAlmostEqual(values[5], prices[5] / prices[0] - 1.0, places=12)
+        self.assertAlmostEqual(values[-1], prices[-1] / prices[-6] - 1.0, places=12)
+
+
+class BatchIndicatorTests(IndicatorEndpointTestCase):
+    def test_batch_matches_individual_requests(self):
+        prices = _sample_prices(200)
+        specs = [
+            {"indicator": "RSI", "params": {"period": 7}},
+            {"indicator": "RSI", "params": {"period": 21}},
+            {"indicator": "SMA"},
+            {"indicator": "VOLATILITY", "params": {"period": 10}},
+        ]
+
+        response = self.client.post("/indicator/batch", json={"prices": prices, "specs": specs})
+        self.assertEqual(response.status_code, 200, msg=response.text)
+        results = response.json()["results"]
+
+        self.assertEqual(len(results), len(specs))
+        for spec, values in zip(specs, results):
+            single = self.client.post("/indicator", json={"prices": prices, **spec}).json()["values"]
+            self.assertEqual(values, single, msg=spec["indicator"])
+
+    def test_batch_hashes_series_once(self):
+        app_module._clear_indicator_cache()
+        specs = [{"indicator": "RSI", "params": {"period": p}} for p in (5, 10, 15, 20)]
+        with mock.patch.object(app_module, "_series_key", wraps=app_module._series_key) as series_key:
+            response = self.client.post("/indicator/batch", json={"prices": _sample_prices(100), "specs": specs})
+
+        self.assertEqual(response.status_code, 200, msg=response.text)
+        self.assertEqual(series_key.call_count, 1)
+        self.assertEqual(len(app_module._indicator_cache), len(specs))
+
+    def test_batch_errors(self):
+        prices = _sample_prices(30)
+        response = self.client.post("/indicator/batch", json={"prices": prices, "specs": {"indicator": "RSI"}})
+        self.assertEqual(response.status_code, 422)
+
+        too_many = [{"indicator": "SMA"}] * (app_module._BATCH_MAX_SPECS + 1)
+        response = self.client.post("/indicator/batch", json={"prices": prices, "specs": too_many})
+        self.assertEqual(response.status_code, 422)
+
+        specs = [{"indicator": "SMA"}, {"indicator": "NOPE"}]
+        response = self.client.post("/indicator/batch", json={"prices": prices, "specs": specs})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("NOPE", response.json()["detail"])
+
+
+class StreamIndicatorTests(IndicatorEndpointTestCase):
+    def post_stream(self, payload):
+        response = self.client.post("/indicator/stream", json=payload)
+        self.assertEqual(response.status_code, 200, msg=response.text)
+        return response.json()["value"]
+
+    def test_updates_track_full_series_values(self):
+        prices = np.array(_sample_prices(260, seed=3))
+        for ind, full in (("RSI", talib.RSI), ("SMA", talib.SMA), ("EMA", talib.EMA)):
+            session = f"test-{ind}"
+            seeded = self.post_stream({
+                "session": session, "indicator": ind, "params": {"period": 14}, "prices": prices[:200].tolist(),
+            })
+            self.assertAlmostEqual(seeded, full(prices[:200], timeperiod=14)[-1], places=9, msg=ind)
+
+            for i in range(200, prices.size):
+                value = self.post_stream({"session": session, "price": prices[i]})
+                self.assertAlmostEqual(value, full(prices[:i + 1], timeperiod=14)[-1], places=9, msg=f"{ind} @ {i}")
+
+    def test_non_finite_input_never_becomes_an_rsi_value(self):
+        prices = _sample_prices(60)
+        seed = {"session": "finite", "indicator": "RSI", "params": {"period": 14}, "prices": prices}
+        self.assertIsNotNone(self.post_stream(seed))
+        for price in ('"nan"', "NaN", "1e400", '"abc"', "null", "true", '"12"', "1" + "0" * 400):
+            body = '{"session": "finite", "price": %s}' % price
+            response = self.client.post("/indicator/stream", content=body, headers={"Content-Type": "application/json"})
+            self.assertEqual(response.status_code, 422, msg=price)
+        self.assertIsNotNone(self.post_stream({"session": "finite", "price": prices[-1]}))
+
+        prices[30] = float("nan")
+        self.assertTrue(np.isnan(talib.RSI(np.array(prices), timeperiod=14)[-1]))
+        body = json.dumps({**seed, "session": "nan-seed", "prices": prices})  # NaN literal, as json.loads accepts
+        response = self.client.post("/indicator/stream", content=body, headers={"Content-Type": "application/json"})
+        self.assertEqual(response.status_code, 200, msg=response.text)
+        self.assertIsNone(response.json()["value"])
+        self.assertIsNone(self.post_stream({"session": "nan-seed", "price": 100.0}))
+
+    def test_sessions_are_shared_between_worker_processes(self):
+        prices = np.array(_sample_prices(100, seed=9))
+        self.post_stream({"session": "shared", "indicator": "RSI", "params": {"period": 14}, "prices": prices[:-1].tolist()})
+
+        # a separate interpreter stands in for another uvicorn worker
+        code = f"import app; print(repr(app._update_stream('shared', {float(prices[-1])!r})))"
+        result = subprocess.run(
+            [sys.executable, "-c", code], cwd=os.path.dirname(app_module.__file__),
+            capture_output=True, text=True, check=True,
+        )
+
+        self.assertEqual(float(result.stdout.strip().splitlines()[-1]), talib.RSI(prices, timeperiod=14)[-1])
+
+    def test_stream_errors(self):
+        response = self.client.post("/indicator/stream", json={"session": "never-seeded", "price": 100.0})
+        self.assertEqual(response.status_code, 404)
+
+        seed = {"session": "s", "indicator": "RSI", "params": {"period": 14}, "prices": _sample_prices(14)}
+        self.assertEqual(self.client.post("/indicator/stream", json=seed).status_code, 400)
+        seed.update(indicator="ADX", prices=_sample_prices(60))
+        self.assertEqual(self.client.post("/indicator/stream", json=seed).status_code, 400)
+
+
+class ResponseEncodingTests(IndicatorEndpointTestCase):
+    def test_large_responses_are_gzipped(self):
+        payload = {"indicator": "SMA", "prices": _sample_prices(500), "params": {"period": 5}}
+        response = self.client.post("/indicator", json=payload, headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers.get("content-encoding"), "gzip")
+        self.assertEqual(len(response.json()["values"]), 500)
+
+
+class IndicatorDispatchTests(IndicatorEndpointTestCase):
+    def test_every_registered_indicator_is_served(self):
+        close = np.array(_sample_prices(300))
+        series = {
+            "CLOSE_ONLY_HANDLERS": {"prices": close},
+            "HLC_HANDLERS": {"high": close * 1.01, "low": close * 0.99, "close": close},
+            "HLCV_HANDLERS": {"high": close * 1.01, "low": close * 0.99, "close": close, "volume": np.full(close.size, 1e6)},
+            "CLOSE_VOLUME_HANDLERS": {"close": close, "volume": np.full(close.size, 1e6)},
+        }
+        for table, arrays in series.items():
+            payload = {key: arr.tolist() for key, arr in arrays.items()}
+            for ind in getattr(app_module, table):
+                response = self.client.post("/indicator", json={**payload, "indicator": ind.lower()})
+                self.assertEqual(response.status_code, 200, msg=f"{table} {ind}: {response.text}")
+                self.assertEqual(len(response.json()["values"]), close.size)
+
+            response = self.client.post("/indicator", json={**payload, "indicator": "NOPE"})
+            self.assertEqual(response.status_code, 400, msg=table)
+
+
+class BinaryIndicatorTests(IndicatorEndpointTestCase):
+    def post_bin(self, payload):
+        return self.client.post(
+            "/indicator/bin",
+            content=msgpack.packb(payload),
+            headers={"Content-Type": "application/x-msgpack"},
+        )
+
+    def test_binary_round_trip_matches_json_endpoint(self):
+        high = np.array(_sample_prices(60, seed=1)) * 1.01
+        low = high * 0.98
+        close = (high + low) / 2
+        params = {"period": 14}
+
+        response = self.post_bin({
+            "indicator": "ATR", "params": params,
+            "high": high.tobytes(), "low": low.tobytes(), "close": close.tobytes(),
+        })
+        self.assertEqual(response.status_code, 200, msg=response.text)
+        self.assertEqual(response.headers["content-type"], "application/x-msgpack")
+        values = np.frombuffer(msgpack.unpackb(response.content)["values"], dtype="<f8")
+
+        expected = self.client.post("/indicator", json={
+            "indicator": "ATR", "params": params,
+            "high": high.tolist(), "low": low.tolist(), "close": close.tolist(),
+        }).json()["values"]
+        np.testing.assert_array_equal(values, np.array(expected, dtype=float))
+
+    def test_malformed_binary_payloads_are_rejected(self):
+        response = self.client.post("/indicator/bin", content=b"\xc1not msgpack")
+        self.assertEqual(response.status_code, 400)
+
+        response = self.post_bin({"indicator": "SMA", "prices": b"\x00" * 15})
+        self.assertEqual(response.status_code, 422)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -50,6 +50,47 @@ class QuantStatsEndpointTests(unittest.TestCase):
         self.assertIsNotNone(metrics["qs_calmar"])
         self.assertAlmostEqual(metrics["qs_calmar"], expected, places=9)
 
+    def test_fused_metrics_match_quantstats(self):
+        rng = np.random.default_rng(11)
+        returns = rng.normal(0.0005, 0.012, 300).tolist()
+        index = pd.date_range("2020-01-01", periods=len(returns))
+        series = pd.Series(returns, index=index, dtype="float64")
+        expected = {
+            "qs_tail_ratio": qs_stats.tail_ratio(series),
+            "qs_value_at_risk": qs_stats.value_at_risk(series, confidence=0.99),
+            "qs_cvar": qs_stats.cvar(series, confidence=0.99),
+            "qs_ulcer_index": qs_stats.ulcer_index(series),
+            "qs_skew": qs_stats.skew(series),
+            "qs_kurtosis": qs_stats.kurtosis(series),
+            "qs_win_rate": qs_stats.win_rate(series),
+        }
+
+        metrics = self.post_metrics({"returns": returns, "period": "daily", "confidence": 0.99})
+
+        for name, value in expected.items():
+            self.assertIsNotNone(metrics[name], name)
+            self.assertAlmostEqual(metrics[name], float(value), places=9, msg=name)
+        self.assertAlmostEqual(metrics["qs_loss_rate"], 1.0 - metrics["qs_win_rate"], places=12)
+
+    def test_avg_drawdown_matches_drawdown_details(self):
+        rng = np.random.default_rng(5)
+        returns = rng.normal(0.0003, 0.01, 250).tolist()
+        for period, freq in (("daily", "D"), ("weekly", "W")):
+            index = pd.date_range("2020-01-01", periods=len(returns), freq=freq)
+            details = qs_stats.drawdown_details(qs_stats.to_drawdown_series(pd.Series(returns, index=index)))
+
+            metrics = self.post_metrics({"returns": returns, "period": period})
+
+            self.assertGreater(len(details), 1)
+            self.assertAlmostEqual(metrics["qs_avg_drawdown"], details["max drawdown"].mean() / 100, places=12)
+            self.assertAlmostEqual(metrics["qs_avg_drawdown_days"], details["days"].mean(), places=12, msg=period)
+
+    def test_avg_drawdown_is_null_without_drawdowns(self):
+        metrics = self.post_metrics({"returns": [0.01] * 10, "period": "daily"})
+
+        self.assertIsNone(metrics["qs_avg_drawdown"])
+        self.assertIsNone(metrics["qs_avg_drawdown_days"])
+
     def test_calmar_drops_to_none_when_result_is_not_finite(self):
         # steadily increasing equity -> zero drawdown -> infinite calmar
         returns = [0.01] * 10